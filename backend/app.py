@@ -1,27 +1,83 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, timezone, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+import asyncio
+import multiprocessing
+import os
 
-from celestrak import fetch_tle_text, parse_tle_blocks, DEFAULT_CELESTRAK_TLE_URL
-from orbit import TLE, screen_conjunctions, get_orbital_position
-from swpc import summarize_space_weather, get_detailed_space_weather, get_location_specific_weather
+import msgspec
 
-app = FastAPI(title="AZSpaceB Orbital API", version="0.1.0")
+from celestrak import get_catalog, DEFAULT_CELESTRAK_TLE_URL
+from orbit import TLE, screen_conjunctions, get_orbital_positions
+from swpc import summarize_space_weather, get_detailed_space_weather, apply_location_modifiers
+
+# "process", "thread", or unset to pick by core count
+SCREEN_POOL = os.environ.get("SCREEN_POOL")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # CPU-bound screening runs off the event loop. With several cores it goes
+    # to worker processes; Satrec objects can't be pickled, so each worker
+    # keeps its own get_catalog cache, warmed here with the default catalog.
+    # sgp4 holds the GIL while propagating, so threads only pay off where
+    # processes can't help (one core, tight memory): they share this
+    # process's cached catalog by reference and screening only reads it.
+    app.state.pool_kind = SCREEN_POOL or ("process" if (os.cpu_count() or 1) > 1 else "thread")
+    app.state.pool = _make_screen_pool(app.state.pool_kind)
+    yield
+    app.state.pool.shutdown(cancel_futures=True)
+
+def _make_screen_pool(kind):
+    if kind == "process":
+        return ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_screen_worker, initargs=(DEFAULT_CELESTRAK_TLE_URL,),
+        )
+    return ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) + 4))
+
+async def _run_screening(fn, *args):
+    """Run fn on the screening pool, replacing the pool once if a worker died"""
+    loop = asyncio.get_running_loop()
+    pool = app.state.pool
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        # A crashed worker (e.g. OOM-killed) breaks the whole process pool for
+        # good; the first caller to notice swaps in a fresh one
+        if app.state.pool is pool:
+            print("Screening pool broke; starting a new one")
+            app.state.pool = _make_screen_pool(app.state.pool_kind)
+            pool.shutdown(wait=False, cancel_futures=True)
+    return await loop.run_in_executor(app.state.pool, fn, *args)
+
+# Endpoints returning events/positions hand back ORJSONResponse directly so
+# NumPy scalars serialize natively and FastAPI's jsonable_encoder pass is skipped.
+app = FastAPI(title="AZSpaceB Orbital API", version="0.1.0", default_response_class=ORJSONResponse,
+              lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173","http://127.0.0.1:5173","*"],
     allow_methods=["*"], allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 class UserTLE(BaseModel):
     name: str = "USER-SAT"
     tle1: str
     tle2: str
 
-class Satellite(BaseModel):
+# Fleet-sized request bodies (hundreds of satellites) are plain msgspec
+# Structs decoded straight from the request body, skipping Pydantic validation
+class Satellite(msgspec.Struct):
     id: str
     name: str
     tle1: str
@@ -36,17 +92,26 @@ class AnalyzeReq(BaseModel):
     threshold_km: float = 5.0
     max_catalog: int = 200
 
-class MultiSatAnalyzeReq(BaseModel):
+class MultiSatAnalyzeReq(msgspec.Struct):
     satellites: List[Satellite]
-    catalog_url: Optional[str] = Field(default=DEFAULT_CELESTRAK_TLE_URL)
+    catalog_url: Optional[str] = DEFAULT_CELESTRAK_TLE_URL
     window_hours: float = 12.0
     step_seconds: float = 60.0
     threshold_km: float = 5.0
     max_catalog: int = 200
 
-class PositionReq(BaseModel):
+class PositionReq(msgspec.Struct):
     satellites: List[Satellite]
 
+_MULTI_SAT_DECODER = msgspec.json.Decoder(MultiSatAnalyzeReq)
+_POSITION_DECODER = msgspec.json.Decoder(PositionReq)
+
+async def _decode_body(request: Request, decoder: msgspec.json.Decoder):
+    try:
+        return decoder.decode(await request.body())
+    except msgspec.DecodeError as e:  # includes msgspec.ValidationError
+        raise HTTPException(status_code=422, detail=str(e))
+
 @app.get("/")
 def root():
     return {"message": "AZSpaceB Orbital API", "version": "0.1.0", "status": "running"}
@@ -66,44 +131,43 @@ def get_space_weather():
     return get_detailed_space_weather()
 
 @app.post("/positions")
-def get_positions(req: PositionReq):
+async def get_positions(request: Request):
     """Get current orbital positions for multiple satellites with location-specific space weather"""
+    req = await _decode_body(request, _POSITION_DECODER)
     results = []
     now = datetime.now(timezone.utc)
+    # SWPC fetches are IO-bound and cached per process: keep them on the thread executor
+    base_weather = await asyncio.get_running_loop().run_in_executor(None, get_detailed_space_weather)
     
-    for sat in req.satellites:
-        try:
-            tle = TLE(name=sat.name, l1=sat.tle1, l2=sat.tle2)
-            pos = get_orbital_position(tle, now)
-            
-            # Get location-specific space weather
-            location_weather = get_location_specific_weather(
-                pos["lat"], pos["lon"], pos["alt"]
-            )
-            
+    tles = [TLE(name=sat.name, l1=sat.tle1, l2=sat.tle2) for sat in req.satellites]
+    for sat, pos in zip(req.satellites, get_orbital_positions(tles, now)):
+        if "error" in pos:
             results.append({
                 "id": sat.id,
                 "name": sat.name,
-                "position": pos,
-                "space_weather": location_weather,
-                "timestamp": now.isoformat()
-            })
-        except Exception as e:
-            results.append({
-                "id": sat.id,
-                "name": sat.name,
-                "error": str(e),
+                "error": pos["error"],
                 "timestamp": now.isoformat()
             })
+            continue
+        
+        # Get location-specific space weather
+        location_weather = apply_location_modifiers(
+            base_weather, pos["lat"], pos["lon"], pos["alt"]
+        )
+        
+        results.append({
+            "id": sat.id,
+            "name": sat.name,
+            "position": pos,
+            "space_weather": location_weather,
+            "timestamp": now.isoformat()
+        })
     
-    return {"positions": results, "timestamp": now.isoformat()}
+    return ORJSONResponse({"positions": results, "timestamp": now.isoformat()})
 
-@app.post("/analyze-fleet")
-def analyze_fleet(req: MultiSatAnalyzeReq):
-    """Analyze multiple satellites for conjunctions and threats"""
+def _load_fleet_catalog(catalog_url):
     try:
-        tle_text = fetch_tle_text(req.catalog_url)
-        catalog = [TLE(name=b["name"], l1=b["l1"], l2=b["l2"]) for b in parse_tle_blocks(tle_text)]
+        return get_catalog(catalog_url)
     except Exception as e:
         print(f"Catalog fetch error: {e}")
         # Use fallback catalog instead of raising 502
@@ -111,66 +175,124 @@ def analyze_fleet(req: MultiSatAnalyzeReq):
             TLE(name="ISS (ZARYA)", l1="1 25544U 98067A   24298.50000000  .00016717  00000+0  10270-3 0  9005", l2="2 25544  51.6400 208.9163 0006317  69.9862 320.6634 15.50192628473224"),
             TLE(name="HUBBLE SPACE TELESCOPE", l1="1 20580U 90037B   24298.50000000  .00001390  00000+0  71139-4 0  9991", l2="2 20580  28.4697 259.1734 0002901 300.5682 151.9476 15.09742863334442")
         ]
+        return catalog, None
+
+# Screening pool entry points: arguments and results are plain picklable values
+
+def _init_screen_worker(catalog_url):
+    _load_fleet_catalog(catalog_url)
+
+def _screen_one(name, tle1, tle2, catalog_url, window_hours, step_seconds, threshold_km, max_catalog):
+    """Events for one fleet satellite, plus the size of the catalog it was screened against"""
+    catalog, satrecs = _load_fleet_catalog(catalog_url)
+    user_tle = TLE(name=name, l1=tle1, l2=tle2)
+    events = screen_conjunctions(user_tle, catalog, window_hours, step_seconds, threshold_km, max_catalog,
+                                 satrecs=satrecs)
+    return events, len(catalog)
+
+def _do_analyze(req: dict) -> dict:
+    try:
+        catalog, satrecs = get_catalog(req["catalog_url"])
+    except Exception as e:
+        return {"status_code": 502, "detail": f"Catalog fetch failed: {e}"}
+
+    user = req["user_tle"]
+    user_tle = TLE(name=user["name"], l1=user["tle1"], l2=user["tle2"])
+    try:
+        events = screen_conjunctions(user_tle, catalog, req["window_hours"], req["step_seconds"], req["threshold_km"],
+                                     req["max_catalog"], satrecs=satrecs)
+    except Exception as e:
+        return {"status_code": 500, "detail": f"Screening error: {e}"}
+
+    suggestions = []
+    for ev in events[:5]:
+        if ev["min_distance_km"] < 1.0:
+            suggestions.append({"event_with": ev["other_name"],
+                                "action": "Small out-of-plane Δv ~30 min before TCA.",
+                                "why": "Increase miss distance; minimal phasing impact."})
+        elif ev["min_distance_km"] < 3.0:
+            suggestions.append({"event_with": ev["other_name"],
+                                "action": "Along-track bias (advance/delay).",
+                                "why": "Cheap maneuver to desynchronize TCA timing."})
+
+    return {"events": events, "suggestions": suggestions, "catalog_size": len(catalog)}
+
+# Fleet suggestion tiers by miss distance: < 1 km, < 3 km, otherwise
+FLEET_ACTIONS = (
+    {
+        "type": "out_of_plane_maneuver",
+        "description": "Execute small out-of-plane Δv maneuver",
+        "timing": "30 minutes before TCA",
+        "delta_v_estimate": "0.5-1.5 m/s",
+        "reason": "Increase miss distance; minimal phasing impact",
+        "priority": "CRITICAL",
+        "fuel_cost": "Low"
+    },
+    {
+        "type": "along_track_maneuver",
+        "description": "Execute along-track bias maneuver",
+        "timing": "1-2 hours before TCA",
+        "delta_v_estimate": "0.2-0.8 m/s",
+        "reason": "Desynchronize TCA timing with minimal fuel expenditure",
+        "priority": "HIGH",
+        "fuel_cost": "Very Low"
+    },
+    {
+        "type": "monitor",
+        "description": "Continue monitoring conjunction",
+        "timing": "Continuous",
+        "delta_v_estimate": "0 m/s",
+        "reason": "Distance acceptable but requires monitoring",
+        "priority": "MEDIUM",
+        "fuel_cost": "None"
+    },
+)
+
+def _distance_tier(min_distance_km):
+    return 0 if min_distance_km < 1.0 else 1 if min_distance_km < 3.0 else 2
+
+@app.post("/analyze-fleet")
+async def analyze_fleet(request: Request):
+    """Analyze multiple satellites for conjunctions and threats"""
+    req = await _decode_body(request, _MULTI_SAT_DECODER)
+    loop = asyncio.get_running_loop()
+    screens = await asyncio.gather(*[
+        _run_screening(_screen_one, sat.name, sat.tle1, sat.tle2, req.catalog_url,
+                       req.window_hours, req.step_seconds, req.threshold_km, req.max_catalog)
+        for sat in req.satellites
+    ], return_exceptions=True)
+    
+    # Each screen reports the catalog it used; only load it here if none succeeded
+    catalog_size = next((screen[1] for screen in screens if not isinstance(screen, BaseException)), None)
+    if catalog_size is None:
+        catalog, _ = await loop.run_in_executor(None, _load_fleet_catalog, req.catalog_url)
+        catalog_size = len(catalog)
 
     all_results = []
     
-    for sat in req.satellites:
-        user_tle = TLE(name=sat.name, l1=sat.tle1, l2=sat.tle2)
+    for sat, screen in zip(req.satellites, screens):
         try:
-            events = screen_conjunctions(user_tle, catalog, req.window_hours, req.step_seconds, req.threshold_km, req.max_catalog)
+            if isinstance(screen, BaseException):
+                raise screen
+            events = screen[0]
             
             # Generate suggestions for each event
-            suggestions = []
-            for ev in events[:10]:
-                priority = "CRITICAL" if ev["min_distance_km"] < 1.0 else "HIGH" if ev["min_distance_km"] < 3.0 else "MEDIUM"
-                
-                if ev["min_distance_km"] < 1.0:
-                    action = {
-                        "type": "out_of_plane_maneuver",
-                        "description": "Execute small out-of-plane Δv maneuver",
-                        "timing": "30 minutes before TCA",
-                        "delta_v_estimate": "0.5-1.5 m/s",
-                        "reason": "Increase miss distance; minimal phasing impact",
-                        "priority": priority,
-                        "fuel_cost": "Low"
-                    }
-                elif ev["min_distance_km"] < 3.0:
-                    action = {
-                        "type": "along_track_maneuver",
-                        "description": "Execute along-track bias maneuver",
-                        "timing": "1-2 hours before TCA",
-                        "delta_v_estimate": "0.2-0.8 m/s",
-                        "reason": "Desynchronize TCA timing with minimal fuel expenditure",
-                        "priority": priority,
-                        "fuel_cost": "Very Low"
-                    }
-                else:
-                    action = {
-                        "type": "monitor",
-                        "description": "Continue monitoring conjunction",
-                        "timing": "Continuous",
-                        "delta_v_estimate": "0 m/s",
-                        "reason": "Distance acceptable but requires monitoring",
-                        "priority": priority,
-                        "fuel_cost": "None"
-                    }
-                
-                suggestions.append({
-                    "event_with": ev["other_name"],
-                    "tca": ev["tca_utc"],
-                    "distance_km": ev["min_distance_km"],
-                    "relative_speed_km_s": ev["rel_speed_km_s"],
-                    "action": action
-                })
+            suggestions = [{
+                "event_with": ev["other_name"],
+                "tca": ev["tca_utc"],
+                "distance_km": ev["min_distance_km"],
+                "relative_speed_km_s": ev["rel_speed_km_s"],
+                "action": dict(FLEET_ACTIONS[_distance_tier(ev["min_distance_km"])])
+            } for ev in events[:10]]
             
             all_results.append({
                 "satellite_id": sat.id,
                 "satellite_name": sat.name,
                 "events": events,
                 "suggestions": suggestions,
-                "threat_level": "CRITICAL" if any(e["min_distance_km"] < 1.0 for e in events) else 
-                               "HIGH" if any(e["min_distance_km"] < 3.0 for e in events) else
-                               "MEDIUM" if events else "LOW"
+                # events are sorted by miss distance, so the first one sets the level
+                "threat_level": FLEET_ACTIONS[_distance_tier(events[0]["min_distance_km"])]["priority"]
+                                if events else "LOW"
             })
         except Exception as e:
             all_results.append({
@@ -180,49 +302,35 @@ def analyze_fleet(req: MultiSatAnalyzeReq):
                 "threat_level": "UNKNOWN"
             })
     
-    space_weather = get_detailed_space_weather()
+    space_weather = await loop.run_in_executor(None, get_detailed_space_weather)
     
-    return {
+    return ORJSONResponse({
         "satellites": all_results,
         "space_weather": space_weather,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "meta": {
-            "catalog_size": len(catalog),
+            "catalog_size": catalog_size,
             "catalog_url": req.catalog_url,
             "window_hours": req.window_hours,
             "satellites_analyzed": len(req.satellites)
         }
-    }
+    })
 
 @app.post("/analyze")
-def analyze(req: AnalyzeReq):
-    try:
-        tle_text = fetch_tle_text(req.catalog_url)
-        catalog = [TLE(name=b["name"], l1=b["l1"], l2=b["l2"]) for b in parse_tle_blocks(tle_text)]
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Catalog fetch failed: {e}")
-
-    user_tle = TLE(name=req.user_tle.name, l1=req.user_tle.tle1, l2=req.user_tle.tle2)
+async def analyze(req: AnalyzeReq):
+    loop = asyncio.get_running_loop()
+    space_weather = loop.run_in_executor(None, summarize_space_weather)
     try:
-        events = screen_conjunctions(user_tle, catalog, req.window_hours, req.step_seconds, req.threshold_km, req.max_catalog)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Screening error: {e}")
-
-    suggestions = []
-    for ev in events[:5]:
-        if ev["min_distance_km"] < 1.0:
-            suggestions.append({"event_with": ev["other_name"],
-                                "action": "Small out-of-plane Δv ~30 min before TCA.",
-                                "why": "Increase miss distance; minimal phasing impact."})
-        elif ev["min_distance_km"] < 3.0:
-            suggestions.append({"event_with": ev["other_name"],
-                                "action": "Along-track bias (advance/delay).",
-                                "why": "Cheap maneuver to desynchronize TCA timing."})
+        out = await _run_screening(_do_analyze, req.model_dump())
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="Screening worker crashed; try again")
+    if "status_code" in out:
+        raise HTTPException(status_code=out["status_code"], detail=out["detail"])
 
-    return {
-        "events": events,
-        "space_weather": summarize_space_weather(),
-        "suggestions": suggestions,
-        "meta": {"catalog_size": len(catalog), "catalog_url": req.catalog_url,
+    return ORJSONResponse({
+        "events": out["events"],
+        "space_weather": await space_weather,
+        "suggestions": out["suggestions"],
+        "meta": {"catalog_size": out["catalog_size"], "catalog_url": req.catalog_url,
                  "notes": "Demo SGP4 sampler; not Pc. Use covariances/CDMs for research-grade Pc."}
-    }
+    })
@@ -1,26 +1,69 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
+
 import requests
+from sgp4.api import Satrec
+
+from orbit import TLE, sat_from_tle
 
 DEFAULT_CELESTRAK_TLE_URL = "https://celestrak.org/NORAD/elements/gp.php?GROUP=active&FORMAT=tle"
 
+_HEADERS = {'User-Agent': 'AZSpaceB-Orbital-Analysis/1.0 (Educational Research)'}
+
+FALLBACK_TLE_TEXT = """ISS (ZARYA)
+1 25544U 98067A   24298.50000000  .00016717  00000+0  10270-3 0  9005
+2 25544  51.6400 208.9163 0006317  69.9862 320.6634 15.50192628473224
+HUBBLE SPACE TELESCOPE
+1 20580U 90037B   24298.50000000  .00001390  00000+0  71139-4 0  9991
+2 20580  28.4697 259.1734 0002901 300.5682 151.9476 15.09742863334442"""
+
+# Raw catalog text persisted across restarts and shared by worker processes
+CATALOG_CACHE_DIR = os.environ.get("CATALOG_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+# Only these catalogs are written to disk; other client-supplied URLs are
+# cached in memory alone, so the directory can't grow with every URL seen
+PERSISTED_CATALOG_URLS = frozenset({DEFAULT_CELESTRAK_TLE_URL})
+
+# After a failed fetch, callers get the stale (or fallback) catalog for this
+# long before the next one tries the network again
+FETCH_RETRY_SECONDS = 60.0
+
+# Catalogs kept in memory per process. URLs come from clients, so the cache
+# is a small LRU rather than growing with every distinct URL seen.
+MAX_CACHED_CATALOGS = 4
+
+# url -> {"expires", "last_modified", "sha256", "text", "tles", "sats"}, least recently used first
+_CATALOG_CACHE: "OrderedDict[str, Dict]" = OrderedDict()
+_CATALOG_LOCK = threading.Lock()
+# Requests for one URL queue behind a single download without blocking
+# other URLs; striped so the lock table stays fixed-size
+_FETCH_LOCKS = [threading.Lock() for _ in range(16)]
+
 def fetch_tle_text(url: str = DEFAULT_CELESTRAK_TLE_URL) -> str:
     try:
-        r = requests.get(url, timeout=30, headers={
-            'User-Agent': 'AZSpaceB-Orbital-Analysis/1.0 (Educational Research)'
-        })
+        r = requests.get(url, timeout=30, headers=_HEADERS)
         r.raise_for_status()
         return r.text
     except requests.exceptions.RequestException as e:
         print(f"Celestrak API error: {e}")
         # Return a minimal TLE set for testing
-        return """ISS (ZARYA)
-1 25544U 98067A   24298.50000000  .00016717  00000+0  10270-3 0  9005
-2 25544  51.6400 208.9163 0006317  69.9862 320.6634 15.50192628473224
-HUBBLE SPACE TELESCOPE
-1 20580U 90037B   24298.50000000  .00001390  00000+0  71139-4 0  9991
-2 20580  28.4697 259.1734 0002901 300.5682 151.9476 15.09742863334442"""
+        return FALLBACK_TLE_TEXT
 
 def parse_tle_blocks(tle_text: str):
-    lines = [ln.strip() for ln in tle_text.splitlines() if ln.strip()]
+    lines = [ln for ln in map(str.strip, tle_text.splitlines()) if ln]
+    # Fast path: a well-formed 3-line file needs no resyncing, so the name,
+    # line 1 and line 2 columns can be sliced out directly
+    names, l1s, l2s = lines[0::3], lines[1::3], lines[2::3]
+    if (len(names) == len(l2s) and all(map(str.startswith, l1s, repeat("1 ")))
+            and all(map(str.startswith, l2s, repeat("2 ")))):
+        for name, l1, l2 in zip(names, l1s, l2s):
+            yield {"name": name, "l1": l1, "l2": l2}
+        return
     i = 0
     while i + 2 < len(lines):
         name, l1, l2 = lines[i], lines[i+1], lines[i+2]
@@ -29,3 +72,136 @@ def parse_tle_blocks(tle_text: str):
             i += 3
         else:
             i += 1
+
+def _build_catalog(tle_text: str) -> Tuple[List[TLE], List[Optional[Satrec]]]:
+    tles = [TLE(name=b["name"], l1=b["l1"], l2=b["l2"]) for b in parse_tle_blocks(tle_text)]
+    sats = []
+    for tle in tles:
+        try:
+            sats.append(sat_from_tle(tle.l1, tle.l2))
+        except Exception:
+            sats.append(None)  # keeps sats aligned with tles
+    return tles, sats
+
+def _disk_path(url: str) -> str:
+    return os.path.join(CATALOG_CACHE_DIR, f"catalog_{hashlib.sha256(str(url).encode()).hexdigest()[:16]}.json")
+
+def _load_disk_entry(url: str) -> Optional[Dict]:
+    """Persisted {"last_modified", "sha256", "text"} for url plus its "fetched" mtime, if any"""
+    if url not in PERSISTED_CATALOG_URLS:
+        return None
+    path = _disk_path(url)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        if not (isinstance(entry, dict) and isinstance(entry.get("sha256"), str)
+                and isinstance(entry.get("text"), str)):
+            raise ValueError("unexpected cache layout")
+        entry = {"last_modified": entry.get("last_modified"), "sha256": entry["sha256"], "text": entry["text"]}
+        entry["fetched"] = os.path.getmtime(path)
+        return entry
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable catalog cache {path}: {e}")
+        return None
+
+def _save_disk_entry(url: str, entry: Dict):
+    if url not in PERSISTED_CATALOG_URLS:
+        return
+    path = _disk_path(url)
+    try:
+        os.makedirs(CATALOG_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"  # worker processes may write concurrently
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({k: entry[k] for k in ("last_modified", "sha256", "text")}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Could not write catalog cache {path}: {e}")
+
+def _touch_disk_entry(url: str):
+    if url not in PERSISTED_CATALOG_URLS:
+        return
+    try:
+        os.utime(_disk_path(url))
+    except OSError:
+        pass
+
+def _cache_get(url: str) -> Optional[Dict]:
+    with _CATALOG_LOCK:
+        entry = _CATALOG_CACHE.get(url)
+        if entry is not None:
+            _CATALOG_CACHE.move_to_end(url)
+        return entry
+
+def _cache_put(url: str, entry: Dict):
+    with _CATALOG_LOCK:
+        _CATALOG_CACHE[url] = entry
+        _CATALOG_CACHE.move_to_end(url)
+        while len(_CATALOG_CACHE) > MAX_CACHED_CATALOGS:
+            _CATALOG_CACHE.popitem(last=False)
+
+def get_catalog(url: str = DEFAULT_CELESTRAK_TLE_URL, ttl: float = 300.0) -> Tuple[List[TLE], List[Optional[Satrec]]]:
+    """
+    Parsed TLE catalog for url, cached in-process for ttl seconds
+
+    Returns (tles, sats) where sats[i] is the initialized Satrec for tles[i]
+    (None if it failed to parse). Once an entry expires it is revalidated
+    with a conditional GET, and a 200 whose body hashes the same as the
+    cached text reuses the parsed catalog.
+
+    For the URLs in PERSISTED_CATALOG_URLS the raw text is also persisted
+    under CATALOG_CACHE_DIR, so restarted servers and fresh pool workers
+    start from disk instead of each downloading the catalog again.
+    """
+    with _FETCH_LOCKS[hash(url) % len(_FETCH_LOCKS)]:
+        now = time.time()
+        entry = _cache_get(url)
+        if entry is None:
+            disk = _load_disk_entry(url)
+            if disk:
+                tles, sats = _build_catalog(disk["text"])
+                entry = dict(disk, expires=disk["fetched"] + ttl, tles=tles, sats=sats)
+                _cache_put(url, entry)
+        if entry and entry["expires"] > now:
+            return entry["tles"], entry["sats"]
+
+        # The network round trip runs under this URL's lock only
+        headers = dict(_HEADERS)
+        if entry and entry["last_modified"]:
+            headers['If-Modified-Since'] = entry["last_modified"]
+        try:
+            r = requests.get(url, timeout=30, headers=headers)
+            if r.status_code == 304 and entry:
+                entry["expires"] = now + ttl
+                _touch_disk_entry(url)
+                return entry["tles"], entry["sats"]
+            r.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"Celestrak API error: {e}")
+            if entry is None:
+                # Cache the fallback set too, so an outage costs one fetch
+                # attempt per retry interval rather than one per caller
+                tles, sats = _build_catalog(FALLBACK_TLE_TEXT)
+                entry = {"last_modified": None, "sha256": None, "text": None, "tles": tles, "sats": sats}
+                _cache_put(url, entry)
+            # Serve the stale catalog rather than dropping to the fallback set
+            entry["expires"] = now + min(ttl, FETCH_RETRY_SECONDS)
+            return entry["tles"], entry["sats"]
+
+        digest = hashlib.sha256(r.content).hexdigest()
+        if entry and entry["sha256"] == digest:
+            tles, sats = entry["tles"], entry["sats"]
+        else:
+            tles, sats = _build_catalog(r.text)
+        entry = {
+            "expires": now + ttl,
+            "last_modified": r.headers.get('Last-Modified'),
+            "sha256": digest,
+            "text": r.text,
+            "tles": tles,
+            "sats": sats,
+        }
+        _cache_put(url, entry)
+        _save_disk_entry(url, entry)
+        return tles, sats
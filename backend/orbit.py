@@ -2,9 +2,24 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 import numpy as np
-from sgp4.api import Satrec, WGS72
-from utils import datetime_to_julian_date
-from probability import compute_collision_probability_analysis, generate_maneuver_suggestions
+from sgp4.api import Satrec, SatrecArray, WGS72
+from utils import datetime_to_julian_date, jd_grid
+from probability import (compute_collision_probability_analysis, compute_collision_probability_batch,
+                         generate_maneuver_suggestions)
+
+# screen_conjunctions samples every COARSE_FACTOR-th step first and only
+# propagates the full-resolution grid around samples that could be close
+COARSE_FACTOR = 5
+# Upper bound on how fast the relative velocity of two orbiting objects can
+# change: both accelerating under surface gravity in opposite directions
+_MAX_REL_ACCEL_KM_S2 = 2 * 0.00981
+# Object-samples per SatrecArray call in the coarse pass (512 objects over a
+# 24 h window at 60 s steps), so its (chunk,Tc,3) buffers stay near 3.5 MB
+# whatever max_catalog and step_seconds are
+PROPAGATE_CHUNK_SAMPLES = 512 * 289
+# Slack on the perigee/apogee filter for SGP4 short-period terms and drag
+# pulling the propagated radius outside the mean-element shell
+SHELL_MARGIN_KM = 50.0
 
 @dataclass
 class TLE:
@@ -22,115 +37,227 @@ def propagate_teme_km(sat: Satrec, t: datetime):
         raise RuntimeError(f"SGP4 error code {e}")
     return np.array(r), np.array(v)  # km, km/s in TEME
 
+def propagate_teme_km_array(sat: Satrec, jd: np.ndarray, fr: np.ndarray):
+    """Propagate a satellite over a whole time grid in one sgp4 call.
+
+    Returns (e, r, v): per-step error codes of shape (T,) and TEME
+    position/velocity arrays of shape (T,3) in km, km/s. Rows with
+    e != 0 are invalid and left for the caller to mask.
+    """
+    return sat.sgp4_array(jd, fr)
+
+def perigee_apogee_km(sats: List[Satrec]):
+    """Perigee and apogee radii (km) of initialized satellites, as two (N,) arrays"""
+    if not sats:
+        return np.empty(0), np.empty(0)
+    a = np.array([sat.a for sat in sats]) * sats[0].radiusearthkm
+    ecc = np.array([sat.ecco for sat in sats])
+    return a * (1.0 - ecc), a * (1.0 + ecc)
+
+def teme_to_lla_array(r: np.ndarray):
+    """
+    Convert TEME positions of shape (...,3) to latitude, longitude, altitude
+
+    Returns (lat, lon, alt) arrays of shape (...) in degrees, degrees, km
+    above a spherical Earth (~6371 km).
+    """
+    r_norm = np.sqrt(np.einsum('...i,...i->...', r, r))
+    lat = np.degrees(np.arcsin(r[..., 2] / r_norm))
+    lon = np.degrees(np.arctan2(r[..., 1], r[..., 0]))
+    alt = r_norm - 6371.0
+    return lat, lon, alt
+
 def teme_to_lat_lon_alt(r_teme):
     """Convert TEME coordinates to latitude, longitude, altitude"""
-    x, y, z = r_teme
-    r = float(np.linalg.norm(r_teme))
-    
-    # Calculate latitude
-    lat = np.arcsin(z / r) * 180 / np.pi
-    
-    # Calculate longitude
-    lon = np.arctan2(y, x) * 180 / np.pi
-    
-    # Calculate altitude (subtract Earth radius ~6371 km)
-    alt = r - 6371.0
-    
-    return {"lat": lat, "lon": lon, "alt": alt}
+    lat, lon, alt = teme_to_lla_array(np.asarray(r_teme, dtype=float))
+    return {"lat": float(lat), "lon": float(lon), "alt": float(alt)}
 
 def get_orbital_position(tle: TLE, t: datetime) -> Dict:
     """Get current position of a satellite"""
     sat = sat_from_tle(tle.l1, tle.l2)
     r, v = propagate_teme_km(sat, t)
     pos = teme_to_lat_lon_alt(r)
-    pos["x"] = float(r[0])
-    pos["y"] = float(r[1])
-    pos["z"] = float(r[2])
-    pos["vx"] = float(v[0])
-    pos["vy"] = float(v[1])
-    pos["vz"] = float(v[2])
+    pos["x"] = r[0]
+    pos["y"] = r[1]
+    pos["z"] = r[2]
+    pos["vx"] = v[0]
+    pos["vy"] = v[1]
+    pos["vz"] = v[2]
     return pos
 
+def get_orbital_positions(tles: List[TLE], t: datetime) -> List[Dict]:
+    """
+    Get current positions of many satellites with one batched sgp4 call
+
+    Returns one dict per TLE, in order, shaped like get_orbital_position;
+    entries that fail to parse or propagate are {"error": message}.
+    """
+    positions: List[Optional[Dict]] = [None] * len(tles)
+    sats, sat_indices = [], []
+    for i, tle in enumerate(tles):
+        try:
+            sats.append(sat_from_tle(tle.l1, tle.l2))
+        except Exception as e:
+            positions[i] = {"error": str(e)}
+            continue
+        sat_indices.append(i)
+    if not sats:
+        return positions
+
+    jd, fr = datetime_to_julian_date(t)
+    err, r, v = SatrecArray(sats).sgp4(np.array([jd], dtype=float), np.array([fr]))
+    err, r, v = err[:, 0], r[:, 0], v[:, 0]
+    lat, lon, alt = (a.tolist() for a in teme_to_lla_array(r))
+    r, v = r.tolist(), v.tolist()
+    for k, i in enumerate(sat_indices):
+        if err[k] != 0:
+            positions[i] = {"error": f"SGP4 error code {err[k]}"}
+            continue
+        positions[i] = {
+            "lat": lat[k], "lon": lon[k], "alt": alt[k],
+            "x": r[k][0], "y": r[k][1], "z": r[k][2],
+            "vx": v[k][0], "vy": v[k][1], "vz": v[k][2],
+        }
+    return positions
+
+def _pc_analysis_one(r_rel: np.ndarray, v_rel: np.ndarray, sat1_name: str, sat2_name: str) -> Dict:
+    try:
+        return compute_collision_probability_analysis(r_rel, v_rel, sat1_name, sat2_name)
+    except Exception as e:
+        print(f"Error computing collision probability for {sat1_name} vs {sat2_name}: {e}")
+        return {"collision_probability": {"error": str(e)}, "safety_level": "UNKNOWN"}
+
 def screen_conjunctions(user_tle: TLE, catalog: List[TLE],
                         window_hours: float = 24.0, step_seconds: float = 60.0,
                         threshold_km: float = 5.0, max_catalog: int = 300,
-                        include_collision_probability: bool = True) -> List[Dict]:
+                        include_collision_probability: bool = True,
+                        satrecs: Optional[List[Optional[Satrec]]] = None) -> List[Dict]:
+    """
+    Screen user_tle against the first max_catalog entries of catalog
+
+    satrecs, if given, holds pre-initialized Satrec objects aligned with
+    catalog (None for entries that failed to parse), e.g. from
+    celestrak.get_catalog, so the TLEs are not re-parsed per call.
+    """
     now = datetime.now(timezone.utc)
-    tgrid = [now + timedelta(seconds=i) for i in range(0, int(window_hours*3600)+1, int(step_seconds))]
+    step = int(step_seconds)
+    jd, fr = jd_grid(now, step, int(window_hours*3600) // step + 1)
+
     user_sat = sat_from_tle(user_tle.l1, user_tle.l2)
-    user_r, user_v = [], []
-    for t in tgrid:
-        r, v = propagate_teme_km(user_sat, t)
-        user_r.append(r); user_v.append(v)
-    user_r = np.vstack(user_r); user_v = np.vstack(user_v)
+    e, user_r, user_v = propagate_teme_km_array(user_sat, jd, fr)
+    if e.any():
+        raise RuntimeError(f"SGP4 error code {int(e[e != 0][0])}")
 
-    results = []
+    sats, sat_indices = [], []
     for idx, tle in enumerate(catalog[:max_catalog]):
-        try:
-            other = sat_from_tle(tle.l1, tle.l2)
-        except Exception:
-            continue
-        dmins, relspeeds, tca_idx = [], [], 0
-        for k, t in enumerate(tgrid):
+        if satrecs is not None:
+            sat = satrecs[idx]
+        else:
             try:
-                r2, v2 = propagate_teme_km(other, t)
+                sat = sat_from_tle(tle.l1, tle.l2)
             except Exception:
-                dmins.append(np.inf); relspeeds.append(np.nan); continue
-            dr = user_r[k] - r2
-            dv = user_v[k] - v2
-            d = float(np.linalg.norm(dr))
-            dmins.append(d); relspeeds.append(float(np.linalg.norm(dv)))
-            if d <= dmins[tca_idx]: tca_idx = k
-        dmin = min(dmins)
-        if dmin < threshold_km:
-            # Get positions at TCA for collision probability analysis
-            tca_time = tgrid[tca_idx]
-            try:
-                r1_tca, v1_tca = propagate_teme_km(user_sat, tca_time)
-                r2_tca, v2_tca = propagate_teme_km(other, tca_time)
-                r_rel = r1_tca - r2_tca
-                v_rel = v1_tca - v2_tca
-                
-                result = {
-                    "other_name": tle.name,
-                    "min_distance_km": dmin,
-                    "tca_utc": tca_time.isoformat(),
-                    "rel_speed_km_s": relspeeds[tca_idx],
-                    "catalog_index": idx
-                }
-                
-                # Add collision probability analysis if requested
-                if include_collision_probability:
-                    try:
-                        pc_analysis = compute_collision_probability_analysis(
-                            r_rel, v_rel, user_tle.name, tle.name
-                        )
-                        result.update(pc_analysis)
-                        
-                        # Add maneuver suggestions based on collision probability
-                        if "collision_probability" in result and result["collision_probability"].get("pc_2d") is not None:
-                            pc_2d = result["collision_probability"]["pc_2d"]
-                            suggestions = generate_maneuver_suggestions(r_rel, v_rel, pc_2d, tca_time)
-                            result["maneuver_suggestions"] = suggestions
-                            
-                    except Exception as e:
-                        print(f"Error computing collision probability for {tle.name}: {e}")
-                        result["collision_probability"] = {"error": str(e)}
-                        result["safety_level"] = "UNKNOWN"
-                
-                results.append(result)
-                
-            except Exception as e:
-                print(f"Error processing TCA for {tle.name}: {e}")
-                # Fallback to basic result without collision probability
-                results.append({
-                    "other_name": tle.name,
-                    "min_distance_km": dmin,
-                    "tca_utc": tca_time.isoformat(),
-                    "rel_speed_km_s": relspeeds[tca_idx],
-                    "catalog_index": idx,
-                    "collision_probability": {"error": str(e)}
-                })
-    
+                sat = None
+        if sat is None:
+            continue
+        sats.append(sat)
+        sat_indices.append(idx)
+
+    # Drop objects whose perigee-apogee shell never comes within threshold_km
+    # of the user's: no point in time can bring them closer than that gap
+    q, Q = perigee_apogee_km(sats)
+    user_q, user_Q = perigee_apogee_km([user_sat])
+    keep = np.flatnonzero(np.maximum(q, user_q) - np.minimum(Q, user_Q) <= threshold_km + SHELL_MARGIN_KM)
+    sats = [sats[n] for n in keep]
+    sat_indices = [sat_indices[n] for n in keep]
+
+    results = []
+    if not sats:
+        return results
+
+    # Coarse pass: propagate the catalog at every COARSE_FACTOR-th step (plus
+    # the last), a chunk of objects per call, shape (chunk,Tc,3)
+    n_steps = len(jd)
+    coarse_idx = np.unique(np.append(np.arange(0, n_steps, COARSE_FACTOR), n_steps - 1))
+    jd_c, fr_c = jd[coarse_idx], fr[coarse_idx]
+    user_r_c, user_v_c = user_r[coarse_idx], user_v[coarse_idx]
+
+    # Within half a coarse gap h of a coarse sample the separation can shrink
+    # by at most (|v_rel| + a_max*h)*h, so fine steps are only needed near
+    # coarse samples that could still come inside the threshold. Invalid
+    # coarse samples give no bound and are always refined.
+    h = COARSE_FACTOR * step / 2.0
+    near = np.empty((len(sats), len(coarse_idx)), dtype=bool)
+    chunk = max(1, PROPAGATE_CHUNK_SAMPLES // len(coarse_idx))
+    for start in range(0, len(sats), chunk):
+        err_c, r_c, v_c = SatrecArray(sats[start:start + chunk]).sgp4(jd_c, fr_c)
+        dr_c = np.subtract(user_r_c, r_c, out=r_c)
+        dv_c = np.subtract(user_v_c, v_c, out=v_c)
+        d_c = np.sqrt(np.einsum('ntj,ntj->nt', dr_c, dr_c))
+        s_c = np.sqrt(np.einsum('ntj,ntj->nt', dv_c, dv_c))
+        near[start:start + len(d_c)] = (d_c - (s_c + _MAX_REL_ACCEL_KM_S2 * h) * h < threshold_km) | (err_c != 0)
+    nearest = np.minimum((np.arange(n_steps) + COARSE_FACTOR // 2) // COARSE_FACTOR, len(coarse_idx) - 1)
+
+    # Fine pass: for each surviving object, propagate only the flagged steps.
+    # Each object's fine mask is expanded from near on its own, so nothing
+    # catalog-sized exists at full time resolution.
+    flagged, tca_flagged, dmin_flagged, r_rel_all, v_rel_all = [], [], [], [], []
+    for n in np.flatnonzero(near.any(axis=1)):
+        steps = np.flatnonzero(near[n, nearest])
+        if not len(steps):
+            continue  # only flagged at a coarse sample no fine step maps to
+        err, r, v = propagate_teme_km_array(sats[n], jd[steps], fr[steps])
+        dr = user_r[steps] - r
+        d = np.sqrt(np.einsum('tj,tj->t', dr, dr))
+        d[err != 0] = np.inf  # mask steps sgp4 flagged as invalid
+        k = d.argmin()
+        if d[k] < threshold_km:
+            flagged.append(n)
+            tca_flagged.append(steps[k])
+            dmin_flagged.append(d[k])
+            r_rel_all.append(dr[k])
+            v_rel_all.append(user_v[steps[k]] - v[k])
+
+    r_rel_all = np.array(r_rel_all).reshape(-1, 3)
+    v_rel_all = np.array(v_rel_all).reshape(-1, 3)
+    rel_speeds = np.sqrt(np.einsum('ij,ij->i', v_rel_all, v_rel_all))
+
+    # Collision probability for every flagged event in one batched call
+    pc_analyses = None
+    if include_collision_probability and len(flagged):
+        other_names = [catalog[sat_indices[n]].name for n in flagged]
+        try:
+            pc_analyses = compute_collision_probability_batch(r_rel_all, v_rel_all, user_tle.name, other_names)
+        except Exception as e:
+            # Redo the events one by one so a failure only costs its own event
+            print(f"Error computing collision probability for {user_tle.name}: {e}")
+            pc_analyses = [_pc_analysis_one(r_rel_all[k], v_rel_all[k], user_tle.name, other_names[k])
+                           for k in range(len(flagged))]
+
+    for k, n in enumerate(flagged):
+        idx = sat_indices[n]
+        tle = catalog[idx]
+        tca_idx = int(tca_flagged[k])
+        tca_time = now + timedelta(seconds=tca_idx * step)
+
+        result = {
+            "other_name": tle.name,
+            "min_distance_km": float(dmin_flagged[k]),
+            "tca_utc": tca_time.isoformat(),
+            "rel_speed_km_s": float(rel_speeds[k]),
+            "catalog_index": idx
+        }
+        
+        if pc_analyses is not None:
+            result.update(pc_analyses[k])
+            
+            # Add maneuver suggestions based on collision probability
+            pc_2d = result["collision_probability"].get("pc_2d")
+            if pc_2d is not None:
+                result["maneuver_suggestions"] = generate_maneuver_suggestions(
+                    r_rel_all[k], v_rel_all[k], pc_2d, tca_time
+                )
+        
+        results.append(result)
+
     results.sort(key=lambda x: x["min_distance_km"])
     return results
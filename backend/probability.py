@@ -4,9 +4,17 @@ Based on the orbital conjunction analysis specification
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Mapping, Tuple, Optional
 from datetime import datetime, timezone
 import math
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; without it the kernel runs as plain Python
+    njit = None
 
 def compute_encounter_plane(r_rel: np.ndarray, v_rel: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
@@ -20,20 +28,32 @@ def compute_encounter_plane(r_rel: np.ndarray, v_rel: np.ndarray) -> Tuple[np.nd
         u_hat: Direction of relative motion (unit vector)
         e1, e2: Orthonormal basis spanning encounter plane
     """
+    # Plain scalar arithmetic: np.cross/np.linalg.norm dispatch costs far
+    # more than the handful of flops on 3-vectors
+    vx, vy, vz = float(v_rel[0]), float(v_rel[1]), float(v_rel[2])
+    
     # Direction of relative motion
-    u_hat = v_rel / np.linalg.norm(v_rel)
+    vn = math.sqrt(vx * vx + vy * vy + vz * vz)
+    ux, uy, uz = vx / vn, vy / vn, vz / vn
     
     # Create orthonormal basis for encounter plane
-    # Choose e1 perpendicular to u_hat
-    if abs(u_hat[2]) < 0.9:
-        e1 = np.cross(u_hat, np.array([0, 0, 1]))
+    # Choose e1 perpendicular to u_hat: u_hat x z, or u_hat x x near the pole
+    if abs(uz) < 0.9:
+        e1x, e1y, e1z = uy, -ux, 0.0
     else:
-        e1 = np.cross(u_hat, np.array([1, 0, 0]))
-    e1 = e1 / np.linalg.norm(e1)
+        e1x, e1y, e1z = 0.0, uz, -uy
+    n1 = math.sqrt(e1x * e1x + e1y * e1y + e1z * e1z)
+    e1x, e1y, e1z = e1x / n1, e1y / n1, e1z / n1
     
     # e2 completes the orthonormal basis
-    e2 = np.cross(u_hat, e1)
-    e2 = e2 / np.linalg.norm(e2)
+    e2x = uy * e1z - uz * e1y
+    e2y = uz * e1x - ux * e1z
+    e2z = ux * e1y - uy * e1x
+    n2 = math.sqrt(e2x * e2x + e2y * e2y + e2z * e2z)
+    
+    u_hat = np.array([ux, uy, uz])
+    e1 = np.array([e1x, e1y, e1z])
+    e2 = np.array([e2x / n2, e2y / n2, e2z / n2])
     
     return u_hat, e1, e2
 
@@ -48,7 +68,72 @@ def project_to_encounter_plane(r_rel: np.ndarray, e1: np.ndarray, e2: np.ndarray
     Returns:
         mu_2d: 2D mean position in encounter plane
     """
-    return np.array([np.dot(e1, r_rel), np.dot(e2, r_rel)])
+    # Scalar dot products on plain floats instead of two np.dot dispatches
+    rx, ry, rz = r_rel.tolist()
+    e1x, e1y, e1z = e1.tolist()
+    e2x, e2y, e2z = e2.tolist()
+    return np.array([e1x * rx + e1y * ry + e1z * rz, e2x * rx + e2y * ry + e2z * rz])
+
+# Poisson means below this start the Chan series at k = 0; past
+# _CHAN_MAX_ARG the large-radius limit replaces the series
+_CHAN_DIRECT_ARG = 700.0
+_CHAN_MAX_ARG = 1e5
+# Poisson(lam) mass below lam - 25 sqrt(lam) is under e^-300, while its pmf
+# there stays far from underflow
+_POISSON_TAIL_SIGMAS = 25.0
+
+def _poisson_pmf(n, lam):
+    """exp(-lam) lam^n / n!, in logs so neither factor over- or underflows"""
+    if lam == 0:
+        return 1.0 if n == 0 else 0.0
+    return math.exp(-lam + n * math.log(lam) - math.lgamma(n + 1))
+
+def _chan_pc(u, v):
+    """
+    Chan's series for the 2D Gaussian integral over the hard-body circle
+    
+    u = HBR^2 / (sigma_x * sigma_y) and v = squared Mahalanobis miss distance.
+    The series is summed as P(K > J) for independent K ~ Poisson(u/2) and
+    J ~ Poisson(v/2), which keeps every term positive so small Pc values
+    don't cancel, and runs until the remaining terms are below double precision.
+    """
+    x, y = 0.5 * u, 0.5 * v
+    if not (x >= 0 and y >= 0):
+        return 0.0
+    if x > _CHAN_MAX_ARG or y > _CHAN_MAX_ARG:
+        # Radius or offset of hundreds of sigmas: the circle edge looks straight
+        return 0.5 * math.erfc((math.sqrt(v + 1.0) - math.sqrt(u)) / math.sqrt(2.0))
+    
+    # Start K and J where their lower tails stop mattering
+    k = max(1, int(x - _POISSON_TAIL_SIGMAS * math.sqrt(x)))
+    j = max(0, int(y - _POISSON_TAIL_SIGMAS * math.sqrt(y)))
+    j_end = y + _POISSON_TAIL_SIGMAS * math.sqrt(y) + 40
+    p = _poisson_pmf(k, x)  # P(K = k)
+    q = _poisson_pmf(j, y)  # P(J = j)
+    cdf = 0.0               # P(J < j)
+    while j < k:
+        if j > j_end:
+            # P(J <= k - 1) is 1 to double precision
+            j, q = k, 0.0
+            break
+        cdf += q
+        j += 1
+        q *= y / j
+    
+    pc = 0.0
+    while True:
+        pc += p * cdf
+        # Once k + 1 > x the remaining terms sum to less than p r / (1 - r)
+        r = x / (k + 1)
+        if r < 1 and p * r <= 1e-16 * pc * (1 - r):
+            break
+        if j == k:
+            cdf += q
+            j += 1
+            q *= y / j
+        k += 1
+        p *= x / k
+    return min(1.0, pc)
 
 def compute_2d_collision_probability(mu_2d: np.ndarray, P_2d: np.ndarray, hbr_m: float) -> float:
     """
@@ -62,46 +147,36 @@ def compute_2d_collision_probability(mu_2d: np.ndarray, P_2d: np.ndarray, hbr_m:
     Returns:
         Pc: Collision probability (0-1)
     """
-    try:
-        # Convert HBR from meters to km
-        hbr_km = hbr_m / 1000.0
-        
-        # Check if covariance is positive definite
-        eigenvals = np.linalg.eigvals(P_2d)
-        if np.any(eigenvals <= 0):
-            # Regularize covariance
-            P_2d = P_2d + np.eye(2) * 1e-6
-        
-        # Cholesky decomposition
-        L = np.linalg.cholesky(P_2d)
-        
-        # Transform to whitened coordinates
-        y = np.linalg.solve(L, mu_2d)
-        
-        # Mahalanobis distance
-        d_mahal = np.linalg.norm(y)
-        
-        # Chan/Alfriend approximation for 2D Gaussian integral over circle
-        if d_mahal == 0:
-            # Special case: mean at origin
-            Pc = 1 - np.exp(-0.5 * (hbr_km**2) / np.linalg.det(P_2d))
-        else:
-            # General case
-            sigma_eff = np.sqrt(np.linalg.det(P_2d))
-            r_norm = hbr_km / sigma_eff
-            
-            if d_mahal < r_norm:
-                # Mean inside circle
-                Pc = 1 - np.exp(-0.5 * r_norm**2) * (1 + 0.5 * r_norm**2)
-            else:
-                # Mean outside circle
-                Pc = np.exp(-0.5 * (d_mahal - r_norm)**2) * (1 - np.exp(-0.5 * r_norm**2))
-        
-        return max(0.0, min(1.0, Pc))
-        
-    except Exception as e:
-        print(f"Error computing 2D collision probability: {e}")
+    # Convert HBR from meters to km
+    hbr_km = hbr_m / 1000.0
+    
+    # Closed-form 2x2 algebra: for matrices this small LAPACK dispatch
+    # costs far more than the arithmetic
+    a, b, d = float(P_2d[0][0]), float(P_2d[1][0]), float(P_2d[1][1])
+    mu0, mu1 = float(mu_2d[0]), float(mu_2d[1])
+    det = a * d - b * b
+    
+    # A symmetric 2x2 is positive definite iff det > 0 and a > 0; written as a
+    # positive test so NaN entries count as not positive definite
+    if not (det > 0 and a > 0):
+        # Regularize covariance
+        a += 1e-6
+        d += 1e-6
+        det = a * d - b * b
+    if not (det > 0 and a > 0):
+        print("Error computing 2D collision probability: Matrix is not positive definite")
         return 0.0
+    
+    # Squared Mahalanobis distance mu^T P^-1 mu; a non-finite one (NaN miss
+    # vector) would otherwise pass through max() as a zero miss distance
+    m2 = (d * mu0 * mu0 - 2 * b * mu0 * mu1 + a * mu1 * mu1) / det
+    if not math.isfinite(m2):
+        print("Error computing 2D collision probability: Miss distance is not finite")
+        return 0.0
+    m2 = max(0.0, m2)
+    
+    # Chan's series, with the circle scaled by sigma_x * sigma_y = sqrt(det)
+    return _chan_pc(hbr_km**2 / math.sqrt(det), m2)
 
 def compute_mahalanobis_distance(mu_2d: np.ndarray, P_2d: np.ndarray) -> float:
     """
@@ -114,11 +189,31 @@ def compute_mahalanobis_distance(mu_2d: np.ndarray, P_2d: np.ndarray) -> float:
     Returns:
         Mahalanobis distance
     """
-    try:
-        P_inv = np.linalg.inv(P_2d)
-        return np.sqrt(mu_2d.T @ P_inv @ mu_2d)
-    except:
+    # Closed-form mu^T P^-1 mu with P^-1 = [[d, -b], [-c, a]] / det
+    a, b, c, d = float(P_2d[0][0]), float(P_2d[0][1]), float(P_2d[1][0]), float(P_2d[1][1])
+    mu0, mu1 = float(mu_2d[0]), float(mu_2d[1])
+    det = a * d - b * c
+    if det == 0:
+        # Singular covariance
         return float('inf')
+    m2 = (d * mu0 * mu0 - (b + c) * mu0 * mu1 + a * mu1 * mu1) / det
+    return math.sqrt(m2) if m2 >= 0 else float('nan')
+
+# Default HBR estimates based on satellite type
+# This is a simplified model - in practice, use actual satellite dimensions
+_LARGE_SAT_RE = re.compile(r'ISS|SPACE STATION|TIANGONG')  # ISS and large satellites
+_SMALL_SAT_RE = re.compile(r'STARLINK|ONEWEB|KEPLER')
+
+# Catalog names repeat across screenings; O(10^4) unique names keeps this bounded
+@lru_cache(maxsize=8192)
+def _single_radius(name: str) -> float:
+    """Size estimate for one satellite from its name, in meters"""
+    upper = name.upper()
+    if _LARGE_SAT_RE.search(upper):
+        return 50.0
+    if _SMALL_SAT_RE.search(upper):
+        return 3.0
+    return 5.0  # default
 
 def estimate_hard_body_radius(sat1_name: str, sat2_name: str) -> float:
     """
@@ -130,25 +225,125 @@ def estimate_hard_body_radius(sat1_name: str, sat2_name: str) -> float:
     Returns:
         HBR in meters
     """
-    # Default HBR estimates based on satellite type
-    # This is a simplified model - in practice, use actual satellite dimensions
+    return _single_radius(sat1_name) + _single_radius(sat2_name)
+
+def _encounter_project(rx, ry, rz, vx, vy, vz, P00, P01, P02, P11, P12, P22):
+    """
+    Fused encounter-plane projection of one relative state, in plain scalars
+    
+    Builds the compute_encounter_plane basis and accumulates mu = E r and
+    P_2d = E P E^T directly from the upper triangle of the 3x3 position
+    covariance, with no intermediate arrays.
+    
+    Returns:
+        (mu0, mu1, P2d00, P2d01, P2d11)
+    """
+    # Direction of relative motion
+    vn = math.sqrt(vx * vx + vy * vy + vz * vz)
+    if not vn > 0:
+        # No relative motion, no encounter plane: NaNs make the Pc step return 0
+        return math.nan, math.nan, math.nan, math.nan, math.nan
+    ux, uy, uz = vx / vn, vy / vn, vz / vn
     
-    # ISS and large satellites
-    if any(keyword in sat1_name.upper() for keyword in ['ISS', 'SPACE STATION', 'TIANGONG']):
-        r1 = 50.0  # meters
-    elif any(keyword in sat1_name.upper() for keyword in ['STARLINK', 'ONEWEB', 'KEPLER']):
-        r1 = 3.0   # meters
+    # e1 = u_hat x z, or u_hat x x when u_hat is close to z
+    if abs(uz) < 0.9:
+        e1x, e1y, e1z = uy, -ux, 0.0
     else:
-        r1 = 5.0   # default
+        e1x, e1y, e1z = 0.0, uz, -uy
+    n1 = math.sqrt(e1x * e1x + e1y * e1y + e1z * e1z)
+    e1x, e1y, e1z = e1x / n1, e1y / n1, e1z / n1
     
-    if any(keyword in sat2_name.upper() for keyword in ['ISS', 'SPACE STATION', 'TIANGONG']):
-        r2 = 50.0
-    elif any(keyword in sat2_name.upper() for keyword in ['STARLINK', 'ONEWEB', 'KEPLER']):
-        r2 = 3.0
+    # e2 = u_hat x e1 completes the basis
+    e2x = uy * e1z - uz * e1y
+    e2y = uz * e1x - ux * e1z
+    e2z = ux * e1y - uy * e1x
+    n2 = math.sqrt(e2x * e2x + e2y * e2y + e2z * e2z)
+    e2x, e2y, e2z = e2x / n2, e2y / n2, e2z / n2
+    
+    mu0 = e1x * rx + e1y * ry + e1z * rz
+    mu1 = e2x * rx + e2y * ry + e2z * rz
+    q1x = P00 * e1x + P01 * e1y + P02 * e1z
+    q1y = P01 * e1x + P11 * e1y + P12 * e1z
+    q1z = P02 * e1x + P12 * e1y + P22 * e1z
+    q2x = P00 * e2x + P01 * e2y + P02 * e2z
+    q2y = P01 * e2x + P11 * e2y + P12 * e2z
+    q2z = P02 * e2x + P12 * e2y + P22 * e2z
+    p00 = e1x * q1x + e1y * q1y + e1z * q1z
+    p01 = e2x * q1x + e2y * q1y + e2z * q1z
+    p11 = e2x * q2x + e2y * q2y + e2z * q2z
+    return mu0, mu1, p00, p01, p11
+
+def _pc_kernel(rx, ry, rz, vx, vy, vz, P00, P01, P02, P11, P12, P22, hbr_km):
+    """
+    Encounter plane, projection and 2D Pc for one conjunction in plain scalars
+    
+    The same math as compute_encounter_plane, project_to_encounter_plane,
+    compute_2d_collision_probability and compute_mahalanobis_distance, written
+    so numba can compile it. Takes the relative state and the upper triangle
+    of the 3x3 position covariance.
+    
+    Returns:
+        (pc, mahalanobis, mu0, mu1, P2d00, P2d01, P2d11)
+    """
+    mu0, mu1, a, b, d = _encounter_project(rx, ry, rz, vx, vy, vz, P00, P01, P02, P11, P12, P22)
+    
+    # Mahalanobis distance on the unregularized covariance
+    det = a * d - b * b
+    if det == 0:
+        mahal = math.inf
     else:
-        r2 = 5.0
+        m2 = (d * mu0 * mu0 - 2 * b * mu0 * mu1 + a * mu1 * mu1) / det
+        mahal = math.sqrt(m2) if m2 >= 0 else math.nan
     
-    return r1 + r2
+    # 2D Pc, as compute_2d_collision_probability
+    ar, dr, detr = a, d, det
+    if not (detr > 0 and ar > 0):
+        ar += 1e-6
+        dr += 1e-6
+        detr = ar * dr - b * b
+    if not (detr > 0 and ar > 0):
+        return 0.0, mahal, mu0, mu1, a, b, d
+    m2r = (dr * mu0 * mu0 - 2 * b * mu0 * mu1 + ar * mu1 * mu1) / detr
+    if not math.isfinite(m2r):
+        return 0.0, mahal, mu0, mu1, a, b, d
+    m2r = max(0.0, m2r)
+    return _chan_pc(hbr_km * hbr_km / math.sqrt(detr), m2r), mahal, mu0, mu1, a, b, d
+
+def _pc_kernel_many(r_rel, v_rel, P_pos_packed, hbr_km):
+    """_pc_kernel over M conjunctions (covariances packed as in pack_sym3); returns an (M,7) array of its outputs"""
+    out = np.empty((r_rel.shape[0], 7))
+    for k in range(r_rel.shape[0]):
+        P00, P11, P22, P01, P02, P12 = (P_pos_packed[k, 0], P_pos_packed[k, 1], P_pos_packed[k, 2],
+                                        P_pos_packed[k, 3], P_pos_packed[k, 4], P_pos_packed[k, 5])
+        pc, mahal, mu0, mu1, p00, p01, p11 = _pc_kernel(
+            r_rel[k, 0], r_rel[k, 1], r_rel[k, 2], v_rel[k, 0], v_rel[k, 1], v_rel[k, 2],
+            P00, P01, P02, P11, P12, P22, hbr_km[k])
+        out[k, 0] = pc
+        out[k, 1] = mahal
+        out[k, 2] = mu0
+        out[k, 3] = mu1
+        out[k, 4] = p00
+        out[k, 5] = p01
+        out[k, 6] = p11
+    return out
+
+if njit is not None:
+    _poisson_pmf = njit(cache=True)(_poisson_pmf)
+    _chan_pc = njit(cache=True)(_chan_pc)
+    _encounter_project = njit(cache=True)(_encounter_project)
+    _pc_kernel = njit(cache=True)(_pc_kernel)
+    _pc_kernel_many = njit(cache=True)(_pc_kernel_many)
+
+# Pc thresholds, ascending: a Pc strictly above _PC_THRESHOLDS[i] reaches
+# _SAFETY_LEVELS[i + 1]. Everything else (including NaN) is LOW.
+_PC_THRESHOLDS = (1e-6, 1e-5, 1e-4)
+_SAFETY_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+def _pc_tier(pc_2d: float) -> int:
+    return bisect_left(_PC_THRESHOLDS, pc_2d)
+
+def _safety_level(pc_2d: float) -> str:
+    return _SAFETY_LEVELS[_pc_tier(pc_2d)]
 
 def compute_collision_probability_analysis(
     r_rel: np.ndarray, 
@@ -167,25 +362,41 @@ def compute_collision_probability_analysis(
         P_rel: Relative covariance matrix (optional)
     
     Returns:
-        Dictionary with collision probability analysis
+        Dictionary with collision probability analysis. The encounter_plane
+        mu_2d/P_2d entries are ndarrays, left for orjson to serialize.
     """
-    try:
-        # Basic encounter parameters
-        d_min = np.linalg.norm(r_rel)
-        v_rel_mag = np.linalg.norm(v_rel)
-        
-        # Estimate Hard Body Radius
-        hbr_m = estimate_hard_body_radius(sat1_name, sat2_name)
-    except Exception as e:
-        print(f"Error in basic parameters: {e}")
+    # Validate inputs here, once, so the numeric kernel below needs no guards
+    r_rel = np.asarray(r_rel, dtype=float)
+    v_rel = np.asarray(v_rel, dtype=float)
+    if P_rel is not None:
+        P_rel = np.asarray(P_rel, dtype=float)
+    if r_rel.shape != (3,) or v_rel.shape != (3,):
+        error = "r_rel and v_rel must be 3-vectors"
+    elif not (np.isfinite(r_rel).all() and np.isfinite(v_rel).all()):
+        error = "Relative state is not finite"
+    elif not (isinstance(sat1_name, str) and isinstance(sat2_name, str)):
+        error = "Satellite names must be strings"
+    elif P_rel is not None and (P_rel.ndim != 2 or min(P_rel.shape) < 3):
+        error = "P_rel must be at least 3x3"
+    else:
+        error = None
+    if error is not None:
+        print(f"Error in basic parameters: {error}")
         return {
             "min_distance_km": 0,
             "relative_speed_km_s": 0,
             "hbr_meters": 10,
-            "collision_probability": {"error": str(e)},
+            "collision_probability": {"error": error},
             "safety_level": "UNKNOWN"
         }
     
+    # Basic encounter parameters
+    d_min = math.sqrt(r_rel @ r_rel)
+    v_rel_mag = math.sqrt(v_rel @ v_rel)
+    
+    # Estimate Hard Body Radius
+    hbr_m = estimate_hard_body_radius(sat1_name, sat2_name)
+    
     result = {
         "min_distance_km": d_min,
         "relative_speed_km_s": v_rel_mag,
@@ -202,57 +413,347 @@ def compute_collision_probability_analysis(
         }
     }
     
-    # If no covariance provided, use simplified model
+    # Only the position block of the covariance enters the 2D Pc
     if P_rel is None:
-        # Create a simple covariance based on distance and velocity
+        # If no covariance provided, use simplified model
         # This is a heuristic - in practice, use proper covariance propagation
         sigma_pos = max(0.1, d_min * 0.1)  # 10% of distance, minimum 100m
-        sigma_vel = max(0.01, v_rel_mag * 0.05)  # 5% of velocity
         
-        # Create diagonal covariance (uncorrelated)
-        P_rel = np.diag([sigma_pos**2, sigma_pos**2, sigma_pos**2, 
-                        sigma_vel**2, sigma_vel**2, sigma_vel**2])
+        # Diagonal (uncorrelated) position covariance
+        P00 = P11 = P22 = sigma_pos**2
+        P01 = P02 = P12 = 0.0
+    else:
+        P00, P01, P02 = float(P_rel[0, 0]), float(P_rel[0, 1]), float(P_rel[0, 2])
+        P11, P12, P22 = float(P_rel[1, 1]), float(P_rel[1, 2]), float(P_rel[2, 2])
     
-    try:
-        # Compute encounter plane
-        u_hat, e1, e2 = compute_encounter_plane(r_rel, v_rel)
-        
-        # Project to encounter plane
-        mu_2d = project_to_encounter_plane(r_rel, e1, e2)
-        
-        # Project covariance to encounter plane
-        E = np.array([e1, e2])  # Projection matrix
-        P_2d = E @ P_rel[:3, :3] @ E.T  # Only position covariance
-        
-        # Compute 2D collision probability
-        pc_2d = compute_2d_collision_probability(mu_2d, P_2d, hbr_m)
-        
-        # Compute Mahalanobis distance
-        mahal_dist = compute_mahalanobis_distance(mu_2d, P_2d)
-        
-        # Update result
-        result["collision_probability"]["pc_2d"] = pc_2d
-        result["collision_probability"]["mahalanobis_distance"] = mahal_dist
-        result["collision_probability"]["encounter_plane"]["mu_2d"] = mu_2d.tolist()
-        result["collision_probability"]["encounter_plane"]["P_2d"] = P_2d.tolist()
-        
-        # Safety assessment
-        if pc_2d > 1e-4:
-            result["safety_level"] = "CRITICAL"
-        elif pc_2d > 1e-5:
-            result["safety_level"] = "HIGH"
-        elif pc_2d > 1e-6:
-            result["safety_level"] = "MEDIUM"
-        else:
-            result["safety_level"] = "LOW"
-            
-    except Exception as e:
-        print(f"Error in collision probability analysis: {e}")
-        result["collision_probability"]["error"] = str(e)
+    if v_rel_mag == 0:
+        # No relative motion: the encounter plane is undefined
+        print("Error in collision probability analysis: zero relative velocity")
+        result["collision_probability"]["error"] = "Zero relative velocity; encounter plane undefined"
         result["safety_level"] = "UNKNOWN"
+        return result
+    
+    # Encounter plane, projection, Pc and Mahalanobis distance in one kernel call
+    pc_2d, mahal_dist, mu0, mu1, p00, p01, p11 = _pc_kernel(
+        float(r_rel[0]), float(r_rel[1]), float(r_rel[2]),
+        float(v_rel[0]), float(v_rel[1]), float(v_rel[2]),
+        P00, P01, P02, P11, P12, P22, hbr_m / 1000.0)
+    
+    # Update result
+    result["collision_probability"]["pc_2d"] = pc_2d
+    result["collision_probability"]["mahalanobis_distance"] = mahal_dist
+    result["collision_probability"]["encounter_plane"]["mu_2d"] = np.array([mu0, mu1])
+    result["collision_probability"]["encounter_plane"]["P_2d"] = np.array([[p00, p01], [p01, p11]])
+    
+    # Safety assessment
+    result["safety_level"] = _safety_level(pc_2d)
     
     return result
 
+# Packed layout of a symmetric 3x3: diagonal first, then the upper triangle
+_SYM3_ROWS = [0, 1, 2, 0, 0, 1]
+_SYM3_COLS = [0, 1, 2, 1, 2, 2]
+
+def pack_sym3(P: np.ndarray) -> np.ndarray:
+    """
+    Pack symmetric 3x3 matrices, shape (...,3,3), into (...,6) as
+    [P00, P11, P22, P01, P02, P12]
+    """
+    return P[..., _SYM3_ROWS, _SYM3_COLS]
+
+def unpack_sym3(P_packed: np.ndarray) -> np.ndarray:
+    """Inverse of pack_sym3: (...,6) back to full symmetric (...,3,3) matrices"""
+    P = np.empty(P_packed.shape[:-1] + (3, 3))
+    P[..., _SYM3_ROWS, _SYM3_COLS] = P_packed
+    P[..., _SYM3_COLS, _SYM3_ROWS] = P_packed
+    return P
+
+def compute_encounter_plane_batch(v_rel: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batched compute_encounter_plane
+    
+    Args:
+        v_rel: Relative velocity vectors, shape (M,3) (km/s)
+    
+    Returns:
+        u_hat, e1, e2: Encounter plane bases, each shape (M,3)
+    """
+    u_hat = v_rel / np.linalg.norm(v_rel, axis=1, keepdims=True)
+    
+    # Same reference axis choice as the scalar version, per row
+    ref = np.where((np.abs(u_hat[:, 2]) < 0.9)[:, None], [0.0, 0.0, 1.0], [1.0, 0.0, 0.0])
+    e1 = np.cross(u_hat, ref)
+    e1 /= np.linalg.norm(e1, axis=1, keepdims=True)
+    
+    e2 = np.cross(u_hat, e1)
+    e2 /= np.linalg.norm(e2, axis=1, keepdims=True)
+    
+    return u_hat, e1, e2
+
+def compute_2d_collision_probability_batch(mu_2d: np.ndarray, P_2d: np.ndarray, hbr_m: np.ndarray) -> np.ndarray:
+    """
+    Batched compute_2d_collision_probability
+    
+    Args:
+        mu_2d: 2D mean positions, shape (M,2)
+        P_2d: 2D covariance matrices, shape (M,2,2)
+        hbr_m: Hard Body Radii in meters, shape (M,)
+    
+    Returns:
+        Pc: Collision probabilities, shape (M,)
+    """
+    hbr_km = hbr_m / 1000.0
+    
+    # Same closed-form 2x2 algebra as the scalar path, over all rows at once
+    a, b, d = P_2d[:, 0, 0], P_2d[:, 1, 0], P_2d[:, 1, 1]
+    mu0, mu1 = mu_2d[:, 0], mu_2d[:, 1]
+    det = a * d - b * b
+    
+    # Regularize the rows that aren't positive definite
+    reg = ~((det > 0) & (a > 0))
+    a = a + reg * 1e-6
+    d = d + reg * 1e-6
+    det = a * d - b * b
+    # Rows still not positive definite get Pc = 0, as in the scalar path
+    bad = ~((det > 0) & (a > 0))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m2 = (d * mu0 * mu0 - 2 * b * mu0 * mu1 + a * mu1 * mu1) / det
+        u = hbr_km**2 / np.sqrt(det)
+    # So do rows with a non-finite miss distance or circle size
+    bad |= ~(np.isfinite(m2) & np.isfinite(u))
+    m2 = np.maximum(0.0, m2)
+    # Bad rows are zeroed before the series so NaNs can't keep it running
+    Pc = _chan_pc_batch(np.where(bad, 0.0, u), np.where(bad, 0.0, m2))
+    Pc[bad] = 0.0
+    return Pc
+
+def _chan_pc_batch(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """_chan_pc over arrays; each row stops adding series terms once its own tail is negligible"""
+    x, y = 0.5 * u, 0.5 * v
+    pc = np.zeros_like(x)
+    # Rows with negative or NaN arguments get 0, as in _chan_pc; rows with
+    # large Poisson means take the scalar path
+    valid = (x >= 0) & (y >= 0)
+    big = valid & ((x > _CHAN_DIRECT_ARG) | (y > _CHAN_DIRECT_ARG))
+    active = valid & ~big
+    x, y = np.where(active, x, 0.0), np.where(active, y, 0.0)
+    p = np.exp(-x)
+    q = np.exp(-y)
+    cdf = q.copy()
+    k = 1
+    while active.any():
+        p *= x / k
+        pc += np.where(active, p * cdf, 0.0)
+        # Same stopping rule as _chan_pc
+        r = x / (k + 1)
+        active &= ~((r < 1) & (p * r <= 1e-16 * pc * (1 - r))) & np.isfinite(pc)
+        q *= y / k
+        cdf += q
+        k += 1
+    for n in np.flatnonzero(big):
+        pc[n] = _chan_pc(float(u[n]), float(v[n]))
+    return np.minimum(pc, 1.0)
+
+def compute_mahalanobis_distance_batch(mu_2d: np.ndarray, P_2d: np.ndarray) -> np.ndarray:
+    """
+    Batched compute_mahalanobis_distance; singular covariances give inf
+    """
+    a, b, c, d = P_2d[:, 0, 0], P_2d[:, 0, 1], P_2d[:, 1, 0], P_2d[:, 1, 1]
+    mu0, mu1 = mu_2d[:, 0], mu_2d[:, 1]
+    det = a * d - b * c
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dist = np.sqrt((d * mu0 * mu0 - (b + c) * mu0 * mu1 + a * mu1 * mu1) / det)
+    dist[det == 0] = np.inf
+    return dist
+
+def _default_pos_cov_packed(d_min: np.ndarray) -> np.ndarray:
+    """Packed (M,6) position covariances from the scalar path's heuristic"""
+    sigma_pos = np.maximum(0.1, d_min * 0.1)
+    P_pos_packed = np.zeros((len(d_min), 6))
+    P_pos_packed[:, :3] = (sigma_pos**2)[:, None]
+    return P_pos_packed
+
+def _pc_arrays(r_rel: np.ndarray, v_rel: np.ndarray, P_pos_packed: np.ndarray, hbr_m: np.ndarray):
+    """Batched Pc kernel: (pc_2d (M,), mahalanobis (M,), mu_2d (M,2), P_2d (M,2,2))"""
+    if njit is not None:
+        out = _pc_kernel_many(np.ascontiguousarray(r_rel, dtype=float), np.ascontiguousarray(v_rel, dtype=float),
+                              np.ascontiguousarray(P_pos_packed, dtype=float), hbr_m / 1000.0)
+        P_2d = np.ascontiguousarray(out[:, [4, 5, 5, 6]]).reshape(-1, 2, 2)
+        return out[:, 0], out[:, 1], out[:, 2:4], P_2d
+    
+    u_hat, e1, e2 = compute_encounter_plane_batch(v_rel)
+    E = np.stack([e1, e2], axis=1)  # (M,2,3) projection matrices
+    mu_2d = np.einsum('nij,nj->ni', E, r_rel)
+    P_2d = E @ unpack_sym3(P_pos_packed) @ E.transpose(0, 2, 1)
+    
+    pc_2d = compute_2d_collision_probability_batch(mu_2d, P_2d, hbr_m)
+    mahal_dist = compute_mahalanobis_distance_batch(mu_2d, P_2d)
+    return pc_2d, mahal_dist, mu_2d, P_2d
+
+def compute_collision_probability_batch(
+    r_rel: np.ndarray,
+    v_rel: np.ndarray,
+    sat1_name: str,
+    sat2_names: List[str],
+    P_rel: Optional[np.ndarray] = None,
+    P_pos_packed: Optional[np.ndarray] = None
+) -> List[Dict]:
+    """
+    Collision probability analysis for M conjunctions of one satellite at once
+    
+    Args:
+        r_rel: Relative position vectors, shape (M,3) (km)
+        v_rel: Relative velocity vectors, shape (M,3) (km/s)
+        sat1_name: Name of the screened satellite
+        sat2_names: Names of the M other objects
+        P_rel: Relative covariance matrices, shape (M,6,6) (optional)
+        P_pos_packed: Position covariances packed as in pack_sym3, shape
+            (M,6) (optional, takes precedence over P_rel)
+    
+    Returns:
+        List of M dictionaries shaped like compute_collision_probability_analysis;
+        each event's mu_2d/P_2d is a row of one shared (M,2)/(M,2,2) array.
+        Rows the scalar path rejects (non-finite state, no relative motion)
+        get its error result instead.
+    """
+    r_rel = np.asarray(r_rel, dtype=float)
+    v_rel = np.asarray(v_rel, dtype=float)
+    d_min = np.linalg.norm(r_rel, axis=1)
+    v_rel_mag = np.linalg.norm(v_rel, axis=1)
+    hbr_m = np.array([estimate_hard_body_radius(sat1_name, name) for name in sat2_names], dtype=float)
+    
+    # Only the position block of the covariance is used
+    if P_pos_packed is None:
+        if P_rel is None:
+            P_pos_packed = _default_pos_cov_packed(d_min)
+        else:
+            P_pos_packed = pack_sym3(P_rel[:, :3, :3])
+    
+    # Validate per row, as the scalar path does, so one bad row can't skew the rest
+    ok = np.isfinite(r_rel).all(axis=1) & np.isfinite(v_rel).all(axis=1) & (v_rel_mag > 0)
+    pc_2d, mahal_dist, mu_2d, P_2d = _pc_arrays(r_rel[ok], v_rel[ok], np.asarray(P_pos_packed)[ok], hbr_m[ok])
+    
+    results = []
+    rows = iter(zip(pc_2d.tolist(), mahal_dist.tolist(), mu_2d, P_2d))
+    for k in range(len(d_min)):
+        if not ok[k]:
+            results.append(compute_collision_probability_analysis(
+                r_rel[k], v_rel[k], sat1_name, sat2_names[k], None if P_rel is None else P_rel[k]))
+            continue
+        pc, mahal, mu_k, P_k = next(rows)
+        results.append({
+            "min_distance_km": float(d_min[k]),
+            "relative_speed_km_s": float(v_rel_mag[k]),
+            "hbr_meters": float(hbr_m[k]),
+            "collision_probability": {
+                "pc_2d": pc,
+                "pc_3d": None,
+                "pc_mc": None,
+                "mahalanobis_distance": mahal,
+                "encounter_plane": {
+                    "mu_2d": mu_k,
+                    "P_2d": P_k
+                }
+            },
+            "safety_level": _safety_level(pc)
+        })
+    return results
+
+# Covariance columns of compute_pc_columns, in pack_sym3 order
+_PC_COV_COLUMNS = ("P00", "P11", "P22", "P01", "P02", "P12")
+
+def compute_pc_columns(cols: Mapping) -> Dict[str, np.ndarray]:
+    """
+    Collision probability for a table of M conjunctions held column-wise
+    
+    Args:
+        cols: Mapping of column name to a length-M sequence, such as a dict
+            of arrays or a pandas DataFrame: rx, ry, rz (km), vx, vy, vz
+            (km/s), sat1 and sat2 (names), and optionally the relative
+            position covariance P00, P01, P02, P11, P12, P22 (km^2)
+    
+    Returns:
+        Dictionary of length-M arrays pc_2d, mahalanobis_distance and
+        safety_level, ready to become columns (e.g. pd.DataFrame(result)).
+        Rows with missing names, missing or non-finite values, or no
+        relative velocity get NaN Pc and distance and safety level UNKNOWN.
+    """
+    r_rel = np.column_stack([np.asarray(cols[c], dtype=float) for c in ("rx", "ry", "rz")])
+    v_rel = np.column_stack([np.asarray(cols[c], dtype=float) for c in ("vx", "vy", "vz")])
+    # Missing names (NaN/None in a table) can't be sized; those rows are invalid
+    names = list(zip(cols["sat1"], cols["sat2"]))
+    named = np.array([isinstance(a, str) and isinstance(b, str) for a, b in names], dtype=bool)
+    hbr_m = np.array([estimate_hard_body_radius(a, b) if ok_k else np.nan for (a, b), ok_k in zip(names, named)],
+                     dtype=float)
+    
+    if all(c in cols for c in _PC_COV_COLUMNS):
+        P_pos_packed = np.column_stack([np.asarray(cols[c], dtype=float) for c in _PC_COV_COLUMNS])
+    else:
+        P_pos_packed = _default_pos_cov_packed(np.linalg.norm(r_rel, axis=1))
+    
+    # Only rows the scalar path would accept reach the kernel
+    ok = (named & np.isfinite(r_rel).all(axis=1) & np.isfinite(v_rel).all(axis=1)
+          & np.isfinite(P_pos_packed).all(axis=1) & (np.abs(v_rel).sum(axis=1) > 0))
+    pc_2d = np.full(len(ok), np.nan)
+    mahal_dist = np.full(len(ok), np.nan)
+    safety_level = np.full(len(ok), "UNKNOWN", dtype=object)
+    if ok.any():
+        pc_ok, mahal_ok, _, _ = _pc_arrays(r_rel[ok], v_rel[ok], P_pos_packed[ok], hbr_m[ok])
+        pc_2d[ok] = pc_ok
+        mahal_dist[ok] = mahal_ok
+        # Vectorized _safety_level; NaN would sort past every threshold
+        tier = np.searchsorted(_PC_THRESHOLDS, pc_ok, side="left")
+        tier[np.isnan(pc_ok)] = 0
+        safety_level[ok] = np.array(_SAFETY_LEVELS, dtype=object)[tier]
+    return {
+        "pc_2d": pc_2d,
+        "mahalanobis_distance": mahal_dist,
+        "safety_level": safety_level
+    }
+
+# Maneuver suggestions per Pc tier (see _pc_tier), built once. The dicts are
+# shared between results, so callers must not mutate them.
+_MANEUVER_SUGGESTIONS = (
+    (),
+    ({
+        # Monitoring recommendation
+        "type": "monitor",
+        "description": "Continue monitoring conjunction",
+        "timing": "Continuous",
+        "delta_v_estimate": "0 m/s",
+        "direction": "None",
+        "reason": "Distance acceptable but requires monitoring",
+        "priority": "MEDIUM",
+        "fuel_cost": "None",
+        "expected_effectiveness": "N/A"
+    },),
+    ({
+        # Along-track maneuver
+        "type": "along_track_maneuver",
+        "description": "Execute along-track bias maneuver",
+        "timing": "1-2 hours before TCA",
+        "delta_v_estimate": "0.2-0.8 m/s",
+        "direction": "Along-track",
+        "reason": "Desynchronize TCA timing with minimal fuel expenditure",
+        "priority": "HIGH",
+        "fuel_cost": "Very Low",
+        "expected_effectiveness": "Medium"
+    },),
+    ({
+        # Out-of-plane maneuver (most effective for increasing miss distance)
+        "type": "out_of_plane_maneuver",
+        "description": "Execute small out-of-plane Δv maneuver",
+        "timing": "30 minutes before TCA",
+        "delta_v_estimate": "0.5-1.5 m/s",
+        "direction": "Cross-track (out-of-plane)",
+        "reason": "Increase miss distance; minimal phasing impact",
+        "priority": "CRITICAL",
+        "fuel_cost": "Low",
+        "expected_effectiveness": "High"
+    },),
+)
+
 def generate_maneuver_suggestions(
     r_rel: np.ndarray, 
     v_rel: np.ndarray, 
@@ -269,50 +770,6 @@ def generate_maneuver_suggestions(
         tca_utc: Time of closest approach
     
     Returns:
-        List of maneuver suggestions
+        List of maneuver suggestions (shared, read-only dicts)
     """
-    suggestions = []
-    
-    if pc_2d > 1e-4:  # Critical threshold
-        # Out-of-plane maneuver (most effective for increasing miss distance)
-        suggestions.append({
-            "type": "out_of_plane_maneuver",
-            "description": "Execute small out-of-plane Δv maneuver",
-            "timing": "30 minutes before TCA",
-            "delta_v_estimate": "0.5-1.5 m/s",
-            "direction": "Cross-track (out-of-plane)",
-            "reason": "Increase miss distance; minimal phasing impact",
-            "priority": "CRITICAL",
-            "fuel_cost": "Low",
-            "expected_effectiveness": "High"
-        })
-        
-    elif pc_2d > 1e-5:  # High threshold
-        # Along-track maneuver
-        suggestions.append({
-            "type": "along_track_maneuver", 
-            "description": "Execute along-track bias maneuver",
-            "timing": "1-2 hours before TCA",
-            "delta_v_estimate": "0.2-0.8 m/s",
-            "direction": "Along-track",
-            "reason": "Desynchronize TCA timing with minimal fuel expenditure",
-            "priority": "HIGH",
-            "fuel_cost": "Very Low",
-            "expected_effectiveness": "Medium"
-        })
-        
-    elif pc_2d > 1e-6:  # Medium threshold
-        # Monitoring recommendation
-        suggestions.append({
-            "type": "monitor",
-            "description": "Continue monitoring conjunction",
-            "timing": "Continuous",
-            "delta_v_estimate": "0 m/s",
-            "direction": "None",
-            "reason": "Distance acceptable but requires monitoring",
-            "priority": "MEDIUM",
-            "fuel_cost": "None",
-            "expected_effectiveness": "N/A"
-        })
-    
-    return suggestions
+    return list(_MANEUVER_SUGGESTIONS[_pc_tier(pc_2d)])
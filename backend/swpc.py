@@ -1,3 +1,6 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 KP_INDEX_URL = "https://services.swpc.noaa.gov/json/planetary_k_index_1m.json"
@@ -5,27 +8,42 @@ XRAY_URL = "https://services.swpc.noaa.gov/json/goes/primary/xrays-1-day.json"
 SOLAR_WIND_URL = "https://services.swpc.noaa.gov/json/rtsw/rtsw_mag_1m.json"
 PROTON_FLUX_URL = "https://services.swpc.noaa.gov/json/goes/primary/integral-protons-plot-6-hour.json"
 
+# Keep-alive session shared by all SWPC fetches, plus a short-lived
+# url -> (expires, json) cache. Cached payloads are shared; don't mutate them.
+_SESSION = requests.Session()
+_CACHE = {}
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+def _cached_get(url: str, ttl: float = 60.0):
+    hit = _CACHE.get(url)
+    if hit and hit[0] > time.time():
+        return hit[1]
+    r = _SESSION.get(url, timeout=20); r.raise_for_status()
+    data = r.json()
+    _CACHE[url] = (time.time() + ttl, data)
+    return data
+
 def fetch_kp_index():
     try:
-        r = requests.get(KP_INDEX_URL, timeout=20); r.raise_for_status(); return r.json()
+        return _cached_get(KP_INDEX_URL)
     except Exception as e:
         return {"error": str(e), "source": KP_INDEX_URL}
 
 def fetch_xray_flux():
     try:
-        r = requests.get(XRAY_URL, timeout=20); r.raise_for_status(); return r.json()
+        return _cached_get(XRAY_URL)
     except Exception as e:
         return {"error": str(e), "source": XRAY_URL}
 
 def fetch_solar_wind():
     try:
-        r = requests.get(SOLAR_WIND_URL, timeout=20); r.raise_for_status(); return r.json()
+        return _cached_get(SOLAR_WIND_URL)
     except Exception as e:
         return {"error": str(e), "source": SOLAR_WIND_URL}
 
 def fetch_proton_flux():
     try:
-        r = requests.get(PROTON_FLUX_URL, timeout=20); r.raise_for_status(); return r.json()
+        return _cached_get(PROTON_FLUX_URL)
     except Exception as e:
         return {"error": str(e), "source": PROTON_FLUX_URL}
 
@@ -42,8 +60,18 @@ def summarize_space_weather():
 
 def get_location_specific_weather(lat: float, lon: float, alt: float):
     """Get space weather data specific to a location"""
-    # Get base space weather data
-    base_weather = get_detailed_space_weather()
+    return apply_location_modifiers(get_detailed_space_weather(), lat, lon, alt)
+
+def apply_location_modifiers(base: dict, lat: float, lon: float, alt: float):
+    """
+    Adjust a get_detailed_space_weather() result for a satellite location
+
+    Returns a new dict; base is left untouched so one fetch can be shared
+    across many satellites.
+    """
+    base_weather = dict(base)
+    base_weather["solar_wind"] = dict(base["solar_wind"])
+    base_weather["kp_index"] = dict(base["kp_index"])
     
     # Calculate location-specific modifications
     # Higher altitudes experience stronger solar wind effects
@@ -103,10 +131,8 @@ def get_location_specific_weather(lat: float, lon: float, alt: float):
 
 def get_detailed_space_weather():
     """Get comprehensive space weather data"""
-    kp = fetch_kp_index()
-    xray = fetch_xray_flux()
-    solar_wind = fetch_solar_wind()
-    proton_flux = fetch_proton_flux()
+    futures = [_EXECUTOR.submit(f) for f in (fetch_kp_index, fetch_xray_flux, fetch_solar_wind, fetch_proton_flux)]
+    kp, xray, solar_wind, proton_flux = [f.result() for f in futures]
     
     # Process KP index
     kp_latest = kp[-1] if isinstance(kp, list) and kp else None
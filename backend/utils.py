@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 import math
+import numpy as np
 
 def datetime_to_julian_date(dt: datetime):
     if dt.tzinfo is None:
@@ -18,3 +19,12 @@ def datetime_to_julian_date(dt: datetime):
     jd_int = math.floor(jd)
     fr = jd - jd_int
     return jd_int, fr
+
+def jd_grid(start_utc: datetime, step_s: float, n: int):
+    """Julian date grid of n samples every step_s seconds from start_utc, as sgp4 (jd, fr) arrays"""
+    jd0, fr0 = datetime_to_julian_date(start_utc)
+    # One datetime conversion for the base; offsets are added to the small
+    # fractional part and whole days carried into jd
+    fr = fr0 + np.arange(n) * (step_s / 86400.0)
+    carry = np.floor(fr)
+    return jd0 + carry, fr - carry